@@ -3,21 +3,250 @@
 Excel file reader using pandas.
 
 This module provides the core functionality to read Excel files
-and convert sheets to pandas DataFrames.
+and convert sheets to pyarrow Tables for writing to Delta tables.
 """
 
+import importlib
+import logging
 import os
 import sys
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from deltalake import write_deltalake
-def read_and_process_excel(file, delta_path, engine=None):
+
+logger = logging.getLogger(__name__)
+
+# pandas (major, minor) version, used for feature checks below
+PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split(".")[:2])
+
+# Module each pandas Excel engine imports, so a requested engine can be
+# loaded once up front
+_ENGINE_MODULES = {
+    "calamine": "python_calamine",
+    "openpyxl": "openpyxl",
+    "xlrd": "xlrd",
+    "odf": "odf",
+    "pyxlsb": "pyxlsb",
+}
+
+
+def _resolve_default_engine():
+    """
+    Pick the Excel engine used when the caller doesn't specify one.
+
+    The WARPTEST_EXCEL_ENGINE environment variable selects the engine for a
+    batch of files in one format: an engine name, or 'default' to let pandas
+    decide per file from the extension. The engine's module is imported
+    here, once per process, instead of lazily on the first read.
+
+    calamine (Rust) is the default because it parses .xlsx several times
+    faster than openpyxl. pandas only ships the calamine engine from 2.2.0
+    onwards; on older versions python-calamine's monkeypatch registers it
+    instead. If the requested engine is unknown or its module isn't installed,
+    None is returned so pandas picks the engine from the file extension
+    (openpyxl for .xlsx).
+
+    Returns:
+        str or None: Engine name, or None to let pandas decide
+    """
+    requested = os.environ.get("WARPTEST_EXCEL_ENGINE", "calamine")
+    if requested == "default":
+        return None
+    if requested not in _ENGINE_MODULES:
+        logger.warning(
+            "Unknown WARPTEST_EXCEL_ENGINE %r (expected one of %s or 'default'); "
+            "letting pandas pick the engine", requested, ", ".join(_ENGINE_MODULES)
+        )
+        return None
+    if requested != "calamine":
+        try:
+            importlib.import_module(_ENGINE_MODULES[requested])
+        except ImportError:
+            logger.warning(
+                "Excel engine %r requested but %s is not installed; "
+                "letting pandas pick the engine", requested, _ENGINE_MODULES[requested]
+            )
+            return None
+        return requested
+
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+
+    if PANDAS_VERSION < (2, 2):
+        try:
+            from python_calamine.pandas import pandas_monkeypatch
+            pandas_monkeypatch()
+        except ImportError:
+            return None
+
+    return "calamine"
+
+
+# Engine used by read_and_process_excel when none is given
+DEFAULT_ENGINE = _resolve_default_engine()
+
+
+def _constant_column(value, num_rows):
+    """
+    Build a dictionary-encoded string column repeating one value.
+    
+    The value is stored once plus an int8 index per row, instead of a
+    string per row. With a single dictionary entry every index is 0, so
+    the narrowest index type is enough.
+    
+    Args:
+        value (str): Value for every row
+        num_rows (int): Length of the column
+        
+    Returns:
+        pyarrow.DictionaryArray: Column of num_rows copies of value
+    """
+    indices = pa.array(np.zeros(num_rows, dtype=np.int8))
+    return pa.DictionaryArray.from_arrays(indices, pa.array([value], type=pa.string()))
+
+
+def _add_metadata_columns(table, absolute_file_path, file_name, file_ext, sheet_name):
+    """
+    Prepend the path, name, ext, worksheet and row columns to a sheet's table.
+    
+    Args:
+        table (pyarrow.Table): Sheet data
+        absolute_file_path (str): Absolute path to the Excel file
+        file_name (str): File name without extension
+        file_ext (str): File extension without the leading dot
+        sheet_name (str): Worksheet name
+        
+    Returns:
+        pyarrow.Table: Table with the metadata columns first
+    """
+    num_rows = table.num_rows
+    
+    metadata_columns = [
+        ('path', _constant_column(absolute_file_path, num_rows)),
+        ('name', _constant_column(file_name, num_rows)),
+        ('ext', _constant_column(file_ext, num_rows)),
+        # Partition column: delta-rs can't partition on dictionary arrays,
+        # and its values aren't stored in the data files anyway
+        ('worksheet', pa.repeat(sheet_name, num_rows)),
+        # Excel sheets have at most 1,048,576 rows, so int32 is always enough
+        ('row', pa.array(np.arange(1, num_rows + 1, dtype=np.int32))),
+    ]
+    for position, (column_name, column) in enumerate(metadata_columns):
+        table = table.add_column(position, column_name, column)
+    
+    return table
+
+
+def _iter_sheet_tables(file, engine):
+    """
+    Yield each sheet of an Excel file as a pyarrow Table of strings.
+    
+    Sheets are parsed one at a time from a single open workbook, and each
+    DataFrame is dropped as soon as it has been converted. Every engine goes
+    through pandas so cells are rendered as the same strings whichever
+    engine read them (calamine and openpyxl agree; see
+    test/compare_engines.py).
+    
+    Columns are named by their position in the sheet ('0', '1', ...) and
+    rows start at the first row of the sheet.
+    
+    Args:
+        file (str): Path to the Excel file
+        engine (str or None): Excel engine to use
+        
+    Yields:
+        tuple: (str, pyarrow.Table) - Sheet name and sheet data
+    """
+    with pd.ExcelFile(file, engine=engine) as workbook:
+        for sheet_name in workbook.sheet_names:
+            # Read the sheet with no header and convert all data to strings
+            df = workbook.parse(sheet_name, header=None, dtype=str)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            del df
+            yield sheet_name, table
+
+
+def read_excel_sheets(file, engine=DEFAULT_ENGINE):
+    """
+    Read all sheets from an Excel file and add the metadata columns.
+    
+    Each sheet is converted to a pyarrow Table with path, name, ext,
+    worksheet and row columns prepended, so it is ready to be written with
+    write_sheets_to_delta. The metadata columns are built as Arrow arrays
+    rather than inserted into the pandas DataFrame, which avoids copying the
+    sheet data on every insert. The constant path, name and ext columns are
+    dictionary-encoded. Sheets are parsed one at a time (see
+    _iter_sheet_tables). Reading is kept separate from writing so callers
+    can parse files in parallel and commit to the Delta table from a single
+    writer.
+    
+    Args:
+        file (str): Path to the Excel file
+        engine (str, optional): Excel engine to use (see read_and_process_excel)
+            
+    Returns:
+        dict: Sheet name -> pyarrow Table with metadata columns
+    """
+    # Get absolute path to the file
+    absolute_file_path = os.path.abspath(file)
+    
+    # Extract file metadata
+    file_name, dot_ext = os.path.splitext(os.path.basename(absolute_file_path))
+    file_ext = dot_ext[1:]  # Remove the leading dot
+    
+    sheets = {}
+    for sheet_name, table in _iter_sheet_tables(file, engine):
+        sheets[sheet_name] = _add_metadata_columns(
+            table, absolute_file_path, file_name, file_ext, sheet_name
+        )
+    
+    return sheets
+
+
+def write_sheets_to_delta(sheets, delta_path):
+    """
+    Append sheets returned by read_excel_sheets to a Delta table.
+    
+    All sheets are combined into one table and written with a single
+    write_deltalake call, so each file is one Delta commit rather than one
+    per sheet. The worksheet column still drives partitioning. Columns
+    missing from some sheets are filled with nulls.
+    
+    Args:
+        sheets (dict): Sheet name -> pyarrow Table with metadata columns
+        delta_path (str): Path for the Delta table
+    """
+    if not sheets:
+        return
+    
+    combined = pa.concat_tables(sheets.values(), promote_options="default")
+    
+    write_deltalake(
+        delta_path,
+        combined,
+        mode="append",
+        partition_by=["worksheet"],
+        schema_mode="merge"
+    )
+    
+    for sheet_name in sheets:
+        logger.debug("Wrote sheet %s to Delta table at %s", sheet_name, delta_path)
+    logger.info("Wrote %d sheets to Delta table at %s", len(sheets), delta_path)
+
+
+def read_and_process_excel(file, delta_path, engine=DEFAULT_ENGINE):
     """
     Read all sheets from an Excel file, process them, and write to a Delta table.
     
     This function:
-    1. Reads all sheets from an Excel file into DataFrames
-    2. Adds metadata columns to each DataFrame (path, name, ext, worksheet, row)
-    3. Writes each DataFrame to a Delta table partitioned by worksheet name
+    1. Reads the sheets of an Excel file one at a time into DataFrames
+    2. Converts each sheet to a pyarrow Table with metadata columns
+       (path, name, ext, worksheet, row)
+    3. Writes all sheets to a Delta table partitioned by worksheet name
+       in a single commit
     
     All operations are wrapped in a try-except block to handle any errors that
     might occur during file reading, path operations, DataFrame manipulation,
@@ -26,59 +255,32 @@ def read_and_process_excel(file, delta_path, engine=None):
     Args:
         file (str): Path to the Excel file
         delta_path (str): Path for the Delta table
-        engine (str, optional): Excel engine to use. Options include:
-            'openpyxl' (default) for .xlsx files
+        engine (str, optional): Excel engine to use (default: DEFAULT_ENGINE,
+            see _resolve_default_engine). Options include:
+            'calamine' (default when python-calamine is installed)
+            'openpyxl' for .xlsx files
             'xlrd' for .xls files
             'odf' for .ods files
             'pyxlsb' for .xlsb files
-            'calamine' for fast reading of Excel files
             None to let pandas decide based on file extension
             
     Returns:
-        tuple: (bool, dict) - Success status and dictionary of pandas DataFrames
+        tuple: (bool, dict) - Success status and dictionary of pyarrow Tables
+            (including the metadata columns)
     """
     # Initialize variables
     success = False
     dfs = None
     
     try:
-        # Read all sheets with no header and convert all data to strings
-        dfs = pd.read_excel(file, sheet_name=None, header=None, engine=engine, dtype=str)
-        
-        # Get absolute path to the file
-        absolute_file_path = os.path.abspath(file)
-        
-        # Extract file metadata
-        file_name = os.path.splitext(os.path.basename(absolute_file_path))[0]
-        file_ext = os.path.splitext(os.path.basename(absolute_file_path))[1][1:]  # Remove the leading dot
-        
-        # Process each DataFrame, adding metadata columns and writing to Delta table
+        dfs = read_excel_sheets(file, engine)
+        write_sheets_to_delta(dfs, delta_path)
         success = True
-        for sheet_name, df in dfs.items():
-            # Create a copy of the DataFrame
-            df = df.copy()
-            
-            # Add metadata columns
-            df.insert(0, 'path', absolute_file_path)
-            df.insert(1, 'name', file_name)
-            df.insert(2, 'ext', file_ext)
-            df.insert(3, 'worksheet', sheet_name)
-            df.insert(4, 'row', range(1, len(df) + 1))
-            
-            write_deltalake(
-                delta_path,
-                df,
-                mode="append",
-                partition_by=["worksheet"],
-                schema_mode="merge"
-            )
-            
-            print(f"Wrote sheet {sheet_name} to Delta table at {delta_path}")
     except Exception as e:
         error_source = "reading Excel file"
         if dfs is not None:
             error_source = "processing Excel data or writing to Delta table"
-        print(f"Error {error_source}: {e}")
+        logger.error("Error %s: %s", error_source, e)
         success = False
     
     return success, dfs
@@ -93,12 +295,18 @@ if __name__ == "__main__":
     
     Arguments:
         file_path (str): Path to the Excel file
-        engine (str, optional): Excel engine to use (default: None)
+        engine (str, optional): Excel engine to use (default: calamine if
+            installed). Pass 'default' to let pandas decide from the extension.
         delta_path (str, optional): Path for the Delta table (default: './data/excel')
     
     Returns:
         Exit code 0 for success, 1 for failure
+    
+    Log verbosity is set with the WARPTEST_LOG_LEVEL environment variable
+    (default: INFO; DEBUG also logs each sheet written).
     """
+    logging.basicConfig(level=os.environ.get("WARPTEST_LOG_LEVEL", "INFO"), format="%(message)s")
+    
     # Check for required file argument
     if len(sys.argv) < 2:
         print("Error: Excel file path is required")
@@ -109,12 +317,13 @@ if __name__ == "__main__":
     file_path = sys.argv[1]
     
     # Get optional engine argument
-    engine = None
+    engine = DEFAULT_ENGINE
     if len(sys.argv) >= 3:
         engine_arg = sys.argv[2]
         # Only set engine if it's not the delta path
         if not engine_arg.startswith('./') and not engine_arg.startswith('/'):
-            engine = engine_arg
+            # 'default' defers engine selection to pandas
+            engine = None if engine_arg == 'default' else engine_arg
     
     # Get optional delta path argument
     delta_path = './data/excel'
@@ -123,7 +332,6 @@ if __name__ == "__main__":
     elif len(sys.argv) == 3 and (sys.argv[2].startswith('./') or sys.argv[2].startswith('/')):
         # If the second argument looks like a path, use it as delta_path
         delta_path = sys.argv[2]
-        engine = None
     
     print(f"Processing Excel file: {file_path}")
     print(f"Engine: {engine or 'default'}")
@@ -1,42 +1,289 @@
-import subprocess
+import multiprocessing
+import concurrent.futures
+import itertools
 import pandas as pd
 import os
 import sys
 import argparse
+import logging
+import sqlite3
 from pathlib import Path
 
-# Get the directory where this script (excel_safe.py) is located
-SCRIPT_DIR = Path(__file__).parent.resolve()
-# Construct the path to read_excel.py relative to this script
-# Assuming read_excel.py is in the same directory as this script
-READ_EXCEL_SCRIPT_PATH = SCRIPT_DIR / "excel.py"
+from excel import DEFAULT_ENGINE, read_and_process_excel, read_excel_sheets, write_sheets_to_delta
 
-def process_excel_files_safely(file_list, errors_dir_path, delta_path):
+# Seconds an isolated attempt may run before it is killed
+ISOLATED_TIMEOUT = 300
+
+# Engines tried in order: the configured engine (calamine unless
+# WARPTEST_EXCEL_ENGINE says otherwise), then pandas' own choice
+ENGINE_ATTEMPTS = (DEFAULT_ENGINE, None) if DEFAULT_ENGINE else (None,)
+
+# Files submitted to the parse pool per worker at any time, so parsing only
+# runs a little ahead of the single Delta writer
+IN_FLIGHT_PER_WORKER = 2
+
+# Ledger of files already written, kept inside the Delta table directory so
+# it goes away with the table. Vacuum ignores names starting with "_".
+# Only local tables get one; see _open_ledger.
+LEDGER_NAME = "_ingested.db"
+
+
+def _file_key(filepath):
+    """
+    Identify one version of a file by its absolute path, mtime and size.
+
+    Returns:
+        tuple: (str, int, int) - Ledger key for the file
+    """
+    stat = os.stat(filepath)
+    return (str(filepath), stat.st_mtime_ns, stat.st_size)
+
+
+def _open_ledger(delta_path):
+    """
+    Open (creating if needed) the ledger of files written to delta_path.
+
+    The ledger is a local SQLite file, so it is only kept for local tables.
+    For a URI such as s3://bucket/table there is no ledger and every file
+    is processed.
+
+    Returns:
+        sqlite3.Connection or None: Connection with the ingested table
+            created, or None if delta_path is a URI
+    """
+    if "://" in str(delta_path):
+        print(f"Delta path {delta_path} is not local; not keeping an ingest ledger.")
+        return None
+
+    Path(delta_path).mkdir(parents=True, exist_ok=True)
+    ledger = sqlite3.connect(Path(delta_path) / LEDGER_NAME)
+    ledger.execute(
+        "CREATE TABLE IF NOT EXISTS ingested ("
+        "path TEXT NOT NULL, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+        "PRIMARY KEY (path, mtime_ns, size))"
+    )
+    return ledger
+
+
+def _is_ingested(ledger, key):
+    """Return True if this version of the file was already written."""
+    if ledger is None:
+        return False
+    row = ledger.execute(
+        "SELECT 1 FROM ingested WHERE path = ? AND mtime_ns = ? AND size = ?", key
+    ).fetchone()
+    return row is not None
+
+
+def _mark_ingested(ledger, key):
+    """Record that this version of the file was written to the Delta table."""
+    if ledger is None:
+        return
+    ledger.execute("INSERT OR IGNORE INTO ingested VALUES (?, ?, ?)", key)
+    ledger.commit()
+
+
+def _read_and_exit(filepath_str, delta_path, engine):
+    """
+    Child process entry point for isolated attempts.
+
+    Exits with 0 on success and 1 on failure so the parent only has to
+    inspect the exit code. A crash (segfault, OOM kill) surfaces as a
+    negative exit code instead of taking the parent down.
+    """
+    success, _ = read_and_process_excel(filepath_str, delta_path, engine=engine)
+    sys.exit(0 if success else 1)
+
+
+def _attempt_isolated(filepath, delta_path, engine):
+    """
+    Run a single read_and_process_excel attempt for one file in a child
+    process with a timeout, for files known to crash the interpreter.
+
+    Returns:
+        bool: True if the file was processed successfully
+    """
+    engine_label = engine or "default"
+
+    process = multiprocessing.Process(
+        target=_read_and_exit,
+        args=(str(filepath), str(delta_path), engine)
+    )
+    process.start()
+    process.join(ISOLATED_TIMEOUT)
+
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        print(f"Timeout processing: {filepath} with {engine_label} engine", file=sys.stderr)
+        return False
+
+    if process.exitcode != 0:
+        print(f"Non-zero exit code ({process.exitcode}) processing {filepath} with {engine_label} engine.")
+        return False
+
+    return True
+
+
+def _read_with_fallback(filepath_str, first_attempt=0):
+    """
+    Worker for parallel processing: read one file with engine fallback.
+
+    Only parsing happens in the worker. The Delta write is left to the
+    parent, because concurrent schema-merging appends from several
+    processes conflict on commit. first_attempt skips engines already
+    tried, for files re-read after a failed write.
+
+    Returns:
+        tuple: (dict or None, int or None) - Sheets ready for
+            write_sheets_to_delta and the position in ENGINE_ATTEMPTS of
+            the engine that read them, or (None, None) if every engine failed
+    """
+    filepath = Path(filepath_str).resolve()
+    for attempt, engine in enumerate(ENGINE_ATTEMPTS[first_attempt:], first_attempt):
+        engine_label = engine or "default"
+        action = "Attempting" if attempt == 0 else "Retrying"
+        print(f"{action} {filepath} with {engine_label} engine...")
+        try:
+            return read_excel_sheets(str(filepath), engine), attempt
+        except Exception as e:
+            print(f"Failed reading {filepath} with {engine_label} engine: {e}", file=sys.stderr)
+    return None, None
+
+
+def _process_sequentially(file_list, delta_path, ledger, keys):
+    """
+    Process files one at a time, trying each engine in ENGINE_ATTEMPTS
+    in a child process.
+
+    Each file is recorded in the ledger as soon as it has been written.
+
+    Returns:
+        list: Files that failed with every engine
+    """
+    error_files = []
+
+    for filepath_str in file_list:
+        filepath = Path(filepath_str).resolve()
+        print(f"Processing {filepath}...")
+
+        # --- Try each engine until one succeeds ---
+        for attempt, engine in enumerate(ENGINE_ATTEMPTS):
+            engine_label = engine or "default"
+            action = "Attempting" if attempt == 0 else "Retrying"
+            print(f"{action} {filepath} with {engine_label} engine...")
+            if _attempt_isolated(filepath, delta_path, engine):
+                print(f"Successfully processed {filepath} with {engine_label} engine")
+                _mark_ingested(ledger, keys[filepath_str])
+                break  # Success! Move to next file
+        else:
+            print(f"Error in file with default engine: {filepath}", file=sys.stderr)
+            error_files.append(filepath_str) # Log the original string path
+
+    return error_files
+
+
+def _process_in_parallel(file_list, delta_path, max_workers, ledger, keys):
+    """
+    Parse files in a process pool and write them to Delta from this process.
+
+    Files are written in the order they finish parsing, so commits overlap
+    with parsing of the remaining files. At most IN_FLIGHT_PER_WORKER files
+    per worker are submitted at a time, topped up as each one finishes, and
+    each result is dropped once it has been handled, so this process only
+    holds a bounded number of parsed files. If a write fails, the file is
+    re-read in the pool with the next engine; parsing never happens here.
+    Each file is recorded in the ledger as soon as it has been written.
+
+    Returns:
+        list: Files that could not be read or written
+    """
+    error_files = []
+    workers = max_workers or os.cpu_count() or 1
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+    remaining = iter(file_list)
+    futures = {}
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(filepath_str, first_attempt=0):
+            try:
+                futures[executor.submit(_read_with_fallback, filepath_str, first_attempt)] = filepath_str
+            except concurrent.futures.process.BrokenProcessPool as e:
+                print(f"Worker pool unavailable for {Path(filepath_str).resolve()}: {e}. Re-run with --isolate.", file=sys.stderr)
+                error_files.append(filepath_str)
+
+        for filepath_str in itertools.islice(remaining, max_in_flight):
+            submit(filepath_str)
+
+        while futures:
+            done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                filepath_str = futures.pop(future)
+                filepath = Path(filepath_str).resolve()
+
+                try:
+                    sheets, attempt = future.result()
+                except Exception as e:
+                    # A crashed worker breaks the whole pool; --isolate contains it
+                    print(f"Worker failed processing {filepath}: {e}. Re-run with --isolate.", file=sys.stderr)
+                    error_files.append(filepath_str)
+                    continue
+
+                if sheets is None:
+                    print(f"Error in file with default engine: {filepath}", file=sys.stderr)
+                    error_files.append(filepath_str)
+                    continue
+
+                engine_label = ENGINE_ATTEMPTS[attempt] or "default"
+                try:
+                    write_sheets_to_delta(sheets, str(delta_path))
+                except Exception as e:
+                    print(f"Error writing {filepath} to Delta table with {engine_label} engine: {e}", file=sys.stderr)
+                    if attempt + 1 < len(ENGINE_ATTEMPTS):
+                        submit(filepath_str, attempt + 1)
+                    else:
+                        print(f"Error in file with default engine: {filepath}", file=sys.stderr)
+                        error_files.append(filepath_str)
+                    continue
+
+                print(f"Successfully processed {filepath} with {engine_label} engine")
+                _mark_ingested(ledger, keys[filepath_str])
+
+            for filepath_str in itertools.islice(remaining, max_in_flight - len(futures)):
+                submit(filepath_str)
+
+    # Report errors in input order rather than completion order
+    order = {f: i for i, f in enumerate(file_list)}
+    error_files.sort(key=order.get)
+    return error_files
+
+
+def process_excel_files_safely(file_list, errors_dir_path, delta_path, isolate=False, max_workers=None, reingest=False):
     """
     Process Excel files safely with engine fallback:
-    1. First attempt: engine="calamine"
+    1. First attempt: DEFAULT_ENGINE from excel.py (calamine unless
+       WARPTEST_EXCEL_ENGINE selects another engine)
     2. Second attempt: engine=None (default)
     3. If both fail: add to errors list
+    An attempt fails if either reading the file or writing it to the Delta
+    table fails.
     
-    Uses uv run for executing the excel.py script located in the same directory.
+    By default files are parsed in parallel across max_workers processes
+    (default: number of CPUs) and written to the Delta table by this process.
+    If isolate is True files are processed one at a time, each attempt in a
+    child process with a timeout, so a file that crashes the interpreter
+    only fails itself.
+    Files already written to the Delta table, with the same path, mtime and
+    size according to the ledger in delta_path, are skipped unless reingest
+    is True. The ledger is only kept for local tables, not URIs.
     Saves errors to a CSV in the specified errors directory.
     Delta table outputs will be saved to the specified delta path.
     """
     error_files = []
-
-    # Ensure read_excel.py exists before processing any files
-    if not READ_EXCEL_SCRIPT_PATH.is_file():
-        print(f"Error: Required script '{READ_EXCEL_SCRIPT_PATH}' not found.", file=sys.stderr)
-        # Add all potential files to error list as we cannot process them
-        for filepath_str in file_list:
-            filepath = Path(filepath_str)
-            if not filepath.exists():
-                 print(f"File not found: {filepath}. Logging as error.", file=sys.stderr)
-            # Log the original string path provided
-            error_files.append(filepath_str)
-        print("Cannot proceed without excel.py. Exiting.", file=sys.stderr)
-        # Skip writing CSV if read_excel.py is missing, just return the list
-        return error_files # Early exit
+    existing_files = []
+    keys = {}
+    ledger = _open_ledger(delta_path)
 
     for filepath_str in file_list:
         # Resolve the path relative to the CWD *before* checking existence
@@ -46,67 +293,20 @@ def process_excel_files_safely(file_list, errors_dir_path, delta_path):
             print(f"File not found: {filepath}. Skipping.", file=sys.stderr)
             error_files.append(filepath_str) # Log the original string path
             continue
+        keys[filepath_str] = _file_key(filepath)
+        if not reingest and _is_ingested(ledger, keys[filepath_str]):
+            print(f"Already ingested: {filepath}. Skipping.")
+            continue
+        existing_files.append(filepath_str)
 
-        print(f"Processing {filepath}...")
-
-        # --- First attempt with calamine engine ---
-        try:
-            print(f"Attempting {filepath} with calamine engine...")
-            # Pass the resolved, absolute path to the subprocess
-            cmd_calamine = ['uv', 'run', str(READ_EXCEL_SCRIPT_PATH), str(filepath), 'calamine', str(delta_path)]
-            print(f"  Executing: {' '.join(cmd_calamine)}")
-            result_calamine = subprocess.run(
-                cmd_calamine,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                check=False # Don't raise error on non-zero exit
-            )
-
-            print(f"  calamine stdout:\n{result_calamine.stdout}")
-            print(f"  calamine stderr:\n{result_calamine.stderr}")
-
-            if result_calamine.returncode == 0:
-                print(f"Successfully processed {filepath} with calamine engine")
-                continue  # Success! Move to next file
-            else:
-                 print(f"Non-zero exit code ({result_calamine.returncode}) processing {filepath} with calamine engine.")
-
-        except subprocess.TimeoutExpired:
-            print(f"Timeout processing: {filepath} with calamine engine", file=sys.stderr)
-        except Exception as e:
-            print(f"Exception running subprocess for {filepath} with calamine engine: {e}", file=sys.stderr)
-
-        # --- If first attempt failed - try with default engine ---
-        print(f"Retrying {filepath} with default engine...")
-        try:
-             # Pass the resolved, absolute path to the subprocess
-            cmd_default = ['uv', 'run', str(READ_EXCEL_SCRIPT_PATH), str(filepath), str(delta_path)] # No engine specified
-            print(f"  Executing: {' '.join(cmd_default)}")
-            result_default = subprocess.run(
-                cmd_default,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                check=False # Don't raise error on non-zero exit
-            )
-
-            print(f"  default stdout:\n{result_default.stdout}")
-            print(f"  default stderr:\n{result_default.stderr}")
-
-            if result_default.returncode == 0:
-                print(f"Successfully processed {filepath} with default engine")
-                continue  # Success! Move to next file
-            else:
-                print(f"Error in file with default engine: {filepath}. Exit code: {result_default.returncode}", file=sys.stderr)
-                error_files.append(filepath_str) # Log the original string path
-
-        except subprocess.TimeoutExpired:
-            print(f"Timeout processing: {filepath} with default engine", file=sys.stderr)
-            error_files.append(filepath_str) # Log the original string path
-        except Exception as e:
-            print(f"Exception running subprocess for {filepath} with default engine: {e}", file=sys.stderr)
-            error_files.append(filepath_str) # Log the original string path
+    try:
+        if isolate:
+            error_files.extend(_process_sequentially(existing_files, delta_path, ledger, keys))
+        elif existing_files:
+            error_files.extend(_process_in_parallel(existing_files, delta_path, max_workers, ledger, keys))
+    finally:
+        if ledger is not None:
+            ledger.close()
 
     # --- Create and save errors CSV ---
     if error_files:
@@ -129,7 +329,7 @@ def process_excel_files_safely(file_list, errors_dir_path, delta_path):
 # --- Main execution block ---
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="Process Excel files safely using 'excel.py' with engine fallback (calamine -> default).",
+        description="Process Excel files safely using read_and_process_excel with engine fallback (calamine -> default).\nSet WARPTEST_EXCEL_ENGINE to use a different first engine.",
         formatter_class=argparse.RawTextHelpFormatter # Keep formatting in help text
         )
     parser.add_argument(
@@ -153,10 +353,29 @@ if __name__ == "__main__":
         action="store_true",
         help="If specified and no FILE arguments are given, use default example files (data1.xlsx, data2.xlsx, possibly_corrupt.xlsx) if they exist in the current working directory."
     )
+    parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help=f"Process files one at a time, each attempt in a child process with a {ISOLATED_TIMEOUT}s timeout, for files that may crash the interpreter."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes used to parse files in parallel (default: number of CPUs). Ignored with --isolate."
+    )
+    parser.add_argument(
+        "--reingest",
+        action="store_true",
+        help=f"Process files even if the ledger ({LEDGER_NAME} in the Delta table directory, local tables only) shows they were already written unchanged."
+    )
 
 
     args = parser.parse_args()
 
+    # Log verbosity for excel.py comes from WARPTEST_LOG_LEVEL (default: INFO)
+    logging.basicConfig(level=os.environ.get("WARPTEST_LOG_LEVEL", "INFO"), format="%(message)s")
+
     files_to_process = args.files
     # errors_directory is relative to CWD unless an absolute path is given
     errors_directory = Path(args.errors_dir) # Convert to Path object
@@ -183,7 +402,7 @@ if __name__ == "__main__":
 
     if not files_to_process:
          print("\nError: No input files to process.", file=sys.stderr)
-         print(f"Usage: uv run {Path(__file__).relative_to(Path.cwd())} [--errors-dir <dir>] [--use-examples] [<file1.xlsx> ...]", file=sys.stderr)
+         print(f"Usage: uv run {Path(__file__).relative_to(Path.cwd())} [--errors-dir <dir>] [--use-examples] [--isolate] [--workers <n>] [--reingest] [<file1.xlsx> ...]", file=sys.stderr)
          sys.exit(1)
 
 
@@ -194,5 +413,5 @@ if __name__ == "__main__":
     # Call the processing function with the list of original file path strings
     # the Path object for the errors directory, and the delta path
     print(f"Delta table will be saved to: {delta_path}")
-    process_excel_files_safely(files_to_process, errors_directory, delta_path)
+    process_excel_files_safely(files_to_process, errors_directory, delta_path, isolate=args.isolate, max_workers=args.workers, reingest=args.reingest)
 
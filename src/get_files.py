@@ -1,18 +1,25 @@
 from pathlib import Path
-from typing import Union, List, Set
+from typing import Callable, Union, List, Optional
 import os
+import re
 import pathspec
 import concurrent.futures
+import heapq
+import itertools
+import logging
 import time
 import argparse
 import pandas as pd
 from utils import create_directory_if_not_exists, save_to_csv, read_from_csv
-def load_gitignore() -> pathspec.PathSpec:
+
+logger = logging.getLogger(__name__)
+
+def read_gitignore_patterns() -> List[str]:
     """
-    Load the .gitignore file and create a PathSpec object for pattern matching.
+    Read the patterns from the .gitignore file in the current directory.
     
     Returns:
-        PathSpec object with patterns from .gitignore
+        List of pattern lines, without blank lines and comments
     """
     gitignore_path = Path(".gitignore")
     patterns = []
@@ -25,42 +32,125 @@ def load_gitignore() -> pathspec.PathSpec:
                 if line and not line.startswith("#"):
                     patterns.append(line)
     
+    return patterns
+
+def load_gitignore(patterns: Optional[List[str]] = None) -> pathspec.PathSpec:
+    """
+    Load the .gitignore file and create a PathSpec object for pattern matching.
+    
+    Args:
+        patterns: Already-read patterns to compile instead of reading .gitignore
+    
+    Returns:
+        PathSpec object with patterns from .gitignore
+    """
+    if patterns is None:
+        patterns = read_gitignore_patterns()
+    
     return pathspec.PathSpec.from_lines(pathspec.patterns.GitWildMatchPattern, patterns)
 
-def process_folder(folder: str, extensions: List[str], gitignore_spec: pathspec.PathSpec) -> Set[str]:
-    """Process a single folder and return matching files."""
-    print(f"Processing folder: {folder}...")
+# pathspec gives every pattern regex the same named group, and group names
+# can't repeat within one regex
+_NAMED_GROUP = re.compile(r"\(\?P<\w+>")
+
+def compile_gitignore_matcher(gitignore_spec: pathspec.PathSpec) -> Callable[[str], bool]:
+    """
+    Build a match function equivalent to gitignore_spec.match_file.
+    
+    The pattern regexes are joined into one compiled regex, so each path is
+    checked with a single match call instead of one Python-level check per
+    pattern. Negated patterns ("!pattern") depend on pattern order, so specs
+    containing them fall back to gitignore_spec.match_file.
+    
+    Args:
+        gitignore_spec: PathSpec returned by load_gitignore
+    
+    Returns:
+        Function taking a relative path and returning True if it is ignored
+    """
+    patterns = [p for p in gitignore_spec.patterns if p.include is not None]
+    if any(not p.include for p in patterns):
+        return gitignore_spec.match_file
+    if not patterns:
+        return lambda rel_path: False
+    
+    regexes = [_NAMED_GROUP.sub("(?:", p.regex.pattern) for p in patterns]
+    compiled = re.compile("|".join(f"(?:{r})" for r in regexes))
+    
+    def match_file_fast(rel_path: str) -> bool:
+        # pathspec matches against "/"-separated paths
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+        return compiled.match(rel_path) is not None
+    
+    return match_file_fast
+
+def process_folder(folder: str, extensions: List[str], gitignore_spec: pathspec.PathSpec) -> List[str]:
+    """Process a single folder and return matching files, sorted."""
+    logger.debug("Processing folder: %s...", folder)
     start_time = time.time()
     
     path = Path(folder)
     if not path.exists():
-        print(f"  Folder not found: {folder}")
-        return set()
-        
-    matching_files: Set[str] = set()
+        logger.warning("  Folder not found: %s", folder)
+        return []
+    
+    # A single walk never visits a file twice, so no set is needed
+    matching_files: List[str] = []
+    
+    # Resolve the CWD once instead of per file (os.path.relpath calls getcwd)
+    cwd_prefix = os.path.join(os.getcwd(), "")
     
-    # Recursively search for files
-    for ext in extensions:
-        for p in path.rglob(f"*{ext}"):
-            file_path = str(p)
+    match_file = compile_gitignore_matcher(gitignore_spec)
+    
+    # str.endswith accepts a tuple, so all extensions match in one call
+    ext_tuple = tuple(extensions)
+    top = str(path)
+    
+    # Walk the tree once for all extensions
+    for root, dirs, files in os.walk(top):
+        # Keep paths in the form Path.rglob produced, without a leading "./"
+        if top == ".":
+            root = root[2:]
+        root_prefix = os.path.join(root, "")
+        
+        # Get the relative directory for gitignore matching once per
+        # directory; paths outside the CWD are matched as-is
+        if root_prefix.startswith(cwd_prefix):
+            rel_root = root_prefix[len(cwd_prefix):]
+        else:
+            rel_root = root_prefix
+        
+        # Don't descend into ignored directories (e.g. .venv, __pycache__);
+        # the trailing "/" lets directory-only patterns match
+        dirs[:] = [d for d in dirs if not match_file(rel_root + d + "/")]
+        
+        for name in files:
+            if not name.endswith(ext_tuple):
+                continue
             
-            # Get the relative path for gitignore matching
-            try:
-                # Convert to relative path if it's not already
-                rel_path = os.path.relpath(file_path)
-                
-                # Only add the file if it's not ignored by gitignore patterns
-                if not gitignore_spec.match_file(rel_path):
-                    matching_files.add(file_path)
-            except ValueError:
-                # This can happen if files are on different drives
-                matching_files.add(file_path)
+            # Only add the file if it's not ignored by gitignore patterns
+            if not match_file(rel_root + name):
+                matching_files.append(root_prefix + name)
     
     elapsed = time.time() - start_time
-    print(f"  Completed {folder}: found {len(matching_files)} files in {elapsed:.2f} seconds")
+    logger.info("  Completed %s: found %d files in %.2f seconds", folder, len(matching_files), elapsed)
+    
+    # Sorted per folder so get_files can merge instead of re-sorting
+    matching_files.sort()
     return matching_files
 
 
+def _process_folder_worker(folder: str, extensions: List[str], patterns: List[str]) -> List[str]:
+    """
+    Process pool entry point for process_folder.
+    
+    Takes the raw gitignore patterns and compiles the PathSpec in the worker,
+    since the caller's compiled spec isn't passed across processes.
+    """
+    return process_folder(folder, extensions, load_gitignore(patterns))
+
+
 def get_files(folder: Union[str, List[str]], ext: Union[str, List[str]],
               save_csv: bool = False, csv_filename: str = "files.csv") -> List[str]:
     """
@@ -83,35 +173,35 @@ def get_files(folder: Union[str, List[str]], ext: Union[str, List[str]],
     extensions = [e if e.startswith(".") else f".{e}" for e in extensions]
     
     # Load gitignore patterns
-    gitignore_spec = load_gitignore()
-    
-    # Use a set to prevent duplicates
-    matching_files: Set[str] = set()
+    gitignore_patterns = read_gitignore_patterns()
     
     # Handle based on number of folders
     if len(folders) == 1:
         # For a single folder, just process directly
-        matching_files = process_folder(folders[0], extensions, gitignore_spec)
+        result = process_folder(folders[0], extensions, load_gitignore(gitignore_patterns))
     else:
-        # For multiple folders, use parallel processing
-        print(f"Processing {len(folders)} folders in parallel...")
+        # For multiple folders, use parallel processing. Matching is CPU-bound
+        # Python code, so processes are used to get around the GIL
+        logger.info("Processing %d folders in parallel...", len(folders))
         start_time = time.time()
         
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            # Map the function across all folders
-            results = executor.map(
-                lambda f: process_folder(f, extensions, gitignore_spec),
-                folders
-            )
+        max_workers = min(len(folders), os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_process_folder_worker, f, extensions, gitignore_patterns)
+                for f in folders
+            ]
             
-            # Collect all results
-            for folder_files in results:
-                matching_files.update(folder_files)
-                
+            # Collect results as each folder finishes
+            per_folder = [future.result() for future in concurrent.futures.as_completed(futures)]
+        
+        # Each folder's list is already sorted: merge them and drop the
+        # duplicates from overlapping folders, which end up adjacent
+        merged = heapq.merge(*per_folder)
+        result = [file_path for file_path, _ in itertools.groupby(merged)]
+        
         elapsed = time.time() - start_time
-        print(f"All folders processed: found {len(matching_files)} unique files in {elapsed:.2f} seconds")
-    
-    result = sorted(matching_files)
+        logger.info("All folders processed: found %d unique files in %.2f seconds", len(result), elapsed)
     
     # Save to CSV if requested
     if save_csv and result:
@@ -128,6 +218,9 @@ if __name__ == '__main__':
     parser.add_argument("--output", default="files.csv", help="Output CSV filename (default: files.csv)")
     args = parser.parse_args()
     
+    # Log verbosity comes from WARPTEST_LOG_LEVEL (default: INFO)
+    logging.basicConfig(level=os.environ.get("WARPTEST_LOG_LEVEL", "INFO"), format="%(message)s")
+    
     # Default test paths and extensions
     search_paths = ["."]
     
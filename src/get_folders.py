@@ -1,8 +1,14 @@
 from pathlib import Path
 from typing import Union, List, Set
 import argparse
+import concurrent.futures
 import pandas as pd
 from utils import create_directory_if_not_exists, save_to_csv
+def _glob_folders(path: Path, pattern: str) -> List[str]:
+    """Return the folders directly in path that match a glob pattern."""
+    return [str(item) for item in path.glob(pattern) if item.is_dir()]
+
+
 def get_folders(folders: Union[str, List[str]], glob_pattern: Union[str, List[str]], 
                save_csv: bool = False, csv_filename: str = "folders.csv") -> List[str]:
     """
@@ -24,17 +30,16 @@ def get_folders(folders: Union[str, List[str]], glob_pattern: Union[str, List[st
     # Use a set to prevent duplicates
     matching_folders: Set[str] = set()
     
-    # Search each folder
-    for folder in folder_list:
-        path = Path(folder)
-        if not path.exists() or not path.is_dir():
-            continue
-            
-        # For each pattern, find matching folders (non-recursively)
-        for pattern in patterns:
-            for item in path.glob(pattern):
-                if item.is_dir():
-                    matching_folders.add(str(item))
+    # Skip folders that don't exist up front, then search every
+    # (folder, pattern) pair
+    paths = [Path(folder) for folder in folder_list]
+    tasks = [(path, pattern) for path in paths if path.is_dir() for pattern in patterns]
+    
+    # Each glob is an independent, I/O-bound directory scan, so threads
+    # overlap the readdir/stat latency
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+        for folders_found in executor.map(lambda task: _glob_folders(*task), tasks):
+            matching_folders.update(folders_found)
     
     result = sorted(matching_folders)
     
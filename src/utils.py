@@ -3,7 +3,7 @@ Utility functions for the file system operations.
 """
 from pathlib import Path
 from typing import Union, List
-import pandas as pd
+import polars as pl
 
 def create_directory_if_not_exists(directory_path: Union[str, Path]) -> Path:
     """
@@ -42,9 +42,9 @@ def save_to_csv(items: List[str], output_file: str = "items.csv", column_name: s
     data_dir = create_directory_if_not_exists("./data")
     
     # Create DataFrame and save to CSV
-    df = pd.DataFrame(items, columns=[column_name])
+    df = pl.DataFrame({column_name: items}, schema={column_name: pl.String})
     csv_path = data_dir / output_file
-    df.to_csv(csv_path, index=False)
+    df.write_csv(csv_path)
     
     # Determine item type for message (files or folders)
     item_type = "folders" if "folder" in column_name.lower() else "files"
@@ -65,21 +65,21 @@ def read_from_csv(csv_path: str, column_name: str = None) -> List[str]:
         List of paths from the CSV
     """
     try:
-        df = pd.read_csv(csv_path)
+        df = pl.read_csv(csv_path, infer_schema=False)
         
         # If column name is provided and exists, use it
         if column_name and column_name in df.columns:
-            return df[column_name].tolist()
+            return df.get_column(column_name).to_list()
         
         # Try to detect column name from common patterns
         for name in ['path', 'folder_path', 'file_path', 'folder', 'file']:
             if name in df.columns:
-                return df[name].tolist()
+                return df.get_column(name).to_list()
         
         # Default to first column if no matching column found
         column = df.columns[0]
         print(f"No path column detected, using first column: '{column}'")
-        return df[column].tolist()
+        return df.get_column(column).to_list()
         
     except Exception as e:
         print(f"Error reading CSV file: {e}")
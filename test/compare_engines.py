@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Excel Engine Comparison Script
+
+This script checks that read_excel_sheets renders cells as the same strings
+with the calamine engine as with openpyxl, so files read by either engine
+(e.g. after the excel_safe fallback) land in the Delta table with a single
+spelling per value. Floats, booleans, times, durations and dates are the
+cell types where engines are most likely to disagree.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+from typing import List
+
+import openpyxl
+
+from src.excel import read_excel_sheets
+
+# Engines whose output must be identical
+ENGINES = ("calamine", "openpyxl")
+
+# Cell values written to the generated sample workbook
+SAMPLE_VALUES = [
+    3.141592653589793,
+    1 / 3,
+    0.123456789012,
+    1e-7,
+    1e20,
+    2.5,
+    100.0,
+    42,
+    123456789012345678,
+    True,
+    False,
+    datetime.time(13, 5),
+    datetime.timedelta(hours=30),
+    datetime.datetime(2024, 1, 2, 3, 4, 5),
+    datetime.date(2024, 5, 6),
+    "text",
+    None,
+]
+
+
+def create_sample_workbook(file_path: str) -> None:
+    """
+    Write a workbook with one sheet per kind of layout to compare engines on.
+
+    Args:
+        file_path: Path where the sample workbook will be saved
+    """
+    wb = openpyxl.Workbook()
+
+    # One column holding every type (a mixed-type column)
+    ws = wb.active
+    ws.title = "mixed"
+    for value in SAMPLE_VALUES:
+        ws.append([value])
+
+    # One row holding every type (each column has a single type)
+    ws = wb.create_sheet("by_column")
+    ws.append(SAMPLE_VALUES)
+
+    wb.save(file_path)
+
+
+def compare_engines(workbook_path: str) -> List[str]:
+    """
+    Read a workbook with every engine in ENGINES and compare the sheet data.
+
+    Args:
+        workbook_path: Path to the Excel workbook to compare
+
+    Returns:
+        A list of differences, empty if every engine produced the same tables
+    """
+    results = {engine: read_excel_sheets(workbook_path, engine) for engine in ENGINES}
+    expected_engine, *other_engines = ENGINES
+    expected = results[expected_engine]
+
+    differences = []
+    for engine in other_engines:
+        actual = results[engine]
+        if list(actual) != list(expected):
+            differences.append(f"{engine}: sheets {list(actual)} != {expected_engine}: {list(expected)}")
+            continue
+
+        for sheet_name, expected_table in expected.items():
+            actual_table = actual[sheet_name]
+            if actual_table.column_names != expected_table.column_names:
+                differences.append(
+                    f"{sheet_name}: {engine} columns {actual_table.column_names} != "
+                    f"{expected_engine} columns {expected_table.column_names}"
+                )
+                continue
+
+            # Compare cell by cell so every differing value is reported
+            for column_name in expected_table.column_names:
+                expected_values = expected_table.column(column_name).to_pylist()
+                actual_values = actual_table.column(column_name).to_pylist()
+                for row, (e, a) in enumerate(zip(expected_values, actual_values)):
+                    if e != a:
+                        differences.append(
+                            f"{sheet_name} row {row} column {column_name}: "
+                            f"{expected_engine}={e!r} {engine}={a!r}"
+                        )
+
+    return differences
+
+
+def main():
+    """Main function to parse arguments and compare engines."""
+    parser = argparse.ArgumentParser(
+        description="Check that every Excel engine renders cells as the same strings."
+    )
+    parser.add_argument(
+        "workbook_paths",
+        type=str,
+        nargs="*",
+        help="Excel workbooks to compare (default: a generated sample with floats, booleans, times and durations)"
+    )
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workbook_paths = args.workbook_paths
+        if not workbook_paths:
+            sample_path = os.path.join(temp_dir, "engine_sample.xlsx")
+            create_sample_workbook(sample_path)
+            workbook_paths = [sample_path]
+
+        failed = False
+        for workbook_path in workbook_paths:
+            differences = compare_engines(workbook_path)
+            if differences:
+                failed = True
+                print(f"Engines differ on {workbook_path}:")
+                for difference in differences:
+                    print(f"  {difference}")
+            else:
+                print(f"Engines agree on {workbook_path}: {', '.join(ENGINES)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,13 @@ and data. Each workbook contains exactly 10 worksheets.
 """
 
 import argparse
+import concurrent.futures
 import os
 import random
 import string
+from functools import partial
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import openpyxl
 from faker import Faker
@@ -22,12 +24,43 @@ from openpyxl.worksheet.worksheet import Worksheet
 from src.utils import create_directory_if_not_exists
 
 
-def generate_random_worksheet_name(faker: Faker, existing_names: List[str]) -> str:
+# Number of values pre-generated for each kind of Faker data
+POOL_SIZE = 1024
+
+
+def build_value_pools(faker: Faker, size: int = POOL_SIZE) -> Dict[str, List[str]]:
     """
-    Generate a random worksheet name that doesn't exist in the list of existing names.
+    Pre-generate pools of random values so cells can be sampled with random.choice.
+    
+    Calling Faker once per cell is far slower than picking from a list, so each
+    kind of value used by the generator is produced once per run.
     
     Args:
         faker: Faker instance for generating random data
+        size: Number of values to generate for each kind
+    
+    Returns:
+        A dictionary mapping the value kind to its list of values
+    """
+    return {
+        'word': [faker.word() for _ in range(size)],
+        'job': [faker.job() for _ in range(size)],
+        'city': [faker.city() for _ in range(size)],
+        'country': [faker.country() for _ in range(size)],
+        'company': [faker.company() for _ in range(size)],
+        'currency_name': [faker.currency_name() for _ in range(size)],
+        'name': [faker.name() for _ in range(size)],
+        'date': [faker.date() for _ in range(size)],
+        'sentence': [faker.sentence(nb_words=5) for _ in range(size)],
+    }
+
+
+def generate_random_worksheet_name(pools: Dict[str, List[str]], existing_names: List[str]) -> str:
+    """
+    Generate a random worksheet name that doesn't exist in the list of existing names.
+    
+    Args:
+        pools: Pre-generated random values from build_value_pools
         existing_names: List of existing worksheet names to avoid duplicates
     
     Returns:
@@ -37,15 +70,15 @@ def generate_random_worksheet_name(faker: Faker, existing_names: List[str]) -> s
         # Generate a random name using various Faker methods
         name_type = random.randint(1, 5)
         if name_type == 1:
-            name = faker.word().capitalize()
+            name = random.choice(pools['word']).capitalize()
         elif name_type == 2:
-            name = faker.job()
+            name = random.choice(pools['job'])
         elif name_type == 3:
-            name = faker.city()
+            name = random.choice(pools['city'])
         elif name_type == 4:
-            name = faker.country()
+            name = random.choice(pools['country'])
         else:
-            name = faker.company()[:20]  # Limit length
+            name = random.choice(pools['company'])[:20]  # Limit length
             
         # Clean up the name to be a valid Excel worksheet name
         # Replace invalid characters with underscores
@@ -58,13 +91,18 @@ def generate_random_worksheet_name(faker: Faker, existing_names: List[str]) -> s
             return name
 
 
-def generate_random_data(worksheet: Worksheet, faker: Faker) -> None:
+def generate_random_data(worksheet: Worksheet, pools: Dict[str, List[str]]) -> None:
     """
     Populate a worksheet with random data.
     
+    Rows are appended in order, so this works with write-only worksheets,
+    which stream each row to disk instead of keeping a Cell per value.
+    Write-only mode stores strings inline in each cell rather than in a
+    shared-strings table.
+    
     Args:
-        worksheet: The worksheet to populate
-        faker: Faker instance for generating random data
+        worksheet: The (write-only) worksheet to populate
+        pools: Pre-generated random values from build_value_pools
     """
     # Generate random number of rows and columns (between 5 and 20)
     rows = random.randint(5, 20)
@@ -75,42 +113,100 @@ def generate_random_data(worksheet: Worksheet, faker: Faker) -> None:
     for i in range(cols):
         header_type = random.randint(1, 4)
         if header_type == 1:
-            headers.append(faker.word().capitalize())
+            headers.append(random.choice(pools['word']).capitalize())
         elif header_type == 2:
-            headers.append(faker.currency_name())
+            headers.append(random.choice(pools['currency_name']))
         elif header_type == 3:
-            headers.append(faker.job().split()[0])
+            headers.append(random.choice(pools['job']).split()[0])
         else:
             headers.append(f"Column {string.ascii_uppercase[i]}")
     
-    for col_idx, header in enumerate(headers, 1):
-        worksheet.cell(row=1, column=col_idx, value=header)
+    worksheet.append(headers)
     
     # Add data rows
-    for row_idx in range(2, rows + 2):
-        for col_idx in range(1, cols + 1):
+    for _ in range(rows):
+        row = []
+        for _ in range(cols):
             data_type = random.randint(1, 5)
             if data_type == 1:
-                value = faker.name()
+                value = random.choice(pools['name'])
             elif data_type == 2:
                 value = random.randint(1, 1000)
             elif data_type == 3:
-                value = faker.date()
+                value = random.choice(pools['date'])
             elif data_type == 4:
-                value = faker.company()
+                value = random.choice(pools['company'])
             else:
-                value = faker.sentence(nb_words=5)
+                value = random.choice(pools['sentence'])
             
-            worksheet.cell(row=row_idx, column=col_idx, value=value)
+            row.append(value)
+        
+        worksheet.append(row)
+
+
+# Value pools shared by the workbooks generated in a worker process
+_worker_pools: Dict[str, List[str]] = {}
+
+
+def _init_worker(pools: Dict[str, List[str]]) -> None:
+    """
+    Store the value pools in a worker process once, rather than per workbook.
+    
+    Args:
+        pools: Pre-generated random values from build_value_pools
+    """
+    global _worker_pools
+    _worker_pools = pools
 
 
-def generate_workbooks(write_folder: str, num_workbooks: int = 1000) -> Tuple[bool, Optional[str]]:
+def _generate_one(i: int, write_folder: str, seed: int) -> str:
+    """
+    Build and save a single workbook with 10 random worksheets.
+    
+    Args:
+        i: Number of the workbook, used in its file name
+        write_folder: Directory where the workbook will be saved
+        seed: Random seed of the run, combined with i so every workbook differs
+    
+    Returns:
+        Path of the saved workbook
+    """
+    random.seed(seed ^ i)
+    
+    # Create a new write-only workbook (starts with no worksheets)
+    wb = Workbook(write_only=True)
+    
+    # Create a list to track worksheet names to avoid duplicates
+    worksheet_names = []
+    
+    # Create 10 worksheets with random names and data
+    for j in range(10):
+        sheet_name = generate_random_worksheet_name(_worker_pools, worksheet_names)
+        ws = wb.create_sheet(title=sheet_name)
+        generate_random_data(ws, _worker_pools)
+    
+    # Save the workbook
+    file_path = os.path.join(write_folder, f"workbook_{i:04d}.xlsx")
+    wb.save(file_path)
+    
+    # Close workbook to free resources
+    wb.close()
+    
+    return file_path
+
+
+def generate_workbooks(write_folder: str, num_workbooks: int = 1000,
+                       max_workers: Optional[int] = None) -> Tuple[bool, Optional[str]]:
     """
     Generate Excel workbooks with random worksheet names and data.
     
+    Workbooks are independent, so they are built and saved in parallel
+    across max_workers processes.
+    
     Args:
         write_folder: Directory where workbooks will be saved
         num_workbooks: Number of workbooks to generate (default: 1000)
+        max_workers: Number of worker processes (default: one per CPU)
     
     Returns:
         A tuple (success, error_message) where success is a boolean indicating
@@ -124,42 +220,25 @@ def generate_workbooks(write_folder: str, num_workbooks: int = 1000) -> Tuple[bo
         return False, f"Failed to create directory: {str(e)}"
     
     # Set up the Faker instance for consistent random data
+    seed = random.randint(1, 10000)  # Set a random seed
     faker = Faker()
-    Faker.seed(random.randint(1, 10000))  # Set a random seed
+    Faker.seed(seed)
+    pools = build_value_pools(faker)
     
     # Count of successfully created workbooks
     successful_count = 0
     
     try:
-        for i in range(1, num_workbooks + 1):
-            # Create a new workbook
-            wb = Workbook()
-            
-            # Remove the default worksheet
-            default_sheet = wb.active
-            wb.remove(default_sheet)
-            
-            # Create a list to track worksheet names to avoid duplicates
-            worksheet_names = []
-            
-            # Create 10 worksheets with random names and data
-            for j in range(10):
-                sheet_name = generate_random_worksheet_name(faker, worksheet_names)
-                ws = wb.create_sheet(title=sheet_name)
-                generate_random_data(ws, faker)
-            
-            # Save the workbook
-            file_path = os.path.join(write_folder, f"workbook_{i:04d}.xlsx")
-            wb.save(file_path)
-            
-            # Close workbook to free resources
-            wb.close()
-            
-            successful_count += 1
-            
-            # Print progress every 100 workbooks
-            if i % 100 == 0 or i == num_workbooks:
-                print(f"Generated {i} of {num_workbooks} workbooks")
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(pools,)
+        ) as executor:
+            generate = partial(_generate_one, write_folder=write_folder, seed=seed)
+            for i, _ in enumerate(executor.map(generate, range(1, num_workbooks + 1), chunksize=16), 1):
+                successful_count += 1
+                
+                # Print progress every 100 workbooks
+                if i % 100 == 0 or i == num_workbooks:
+                    print(f"Generated {i} of {num_workbooks} workbooks")
     
     except Exception as e:
         return False, f"Failed after creating {successful_count} workbooks: {str(e)}"
@@ -184,11 +263,17 @@ def main():
         default=1000,
         help="Number of workbooks to generate (default: 1000)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: one per CPU)"
+    )
     
     args = parser.parse_args()
     
     print(f"Generating {args.num_workbooks} workbooks in '{args.write_folder}'...")
-    success, error_message = generate_workbooks(args.write_folder, args.num_workbooks)
+    success, error_message = generate_workbooks(args.write_folder, args.num_workbooks, args.workers)
     
     if success:
         print(f"Successfully generated {args.num_workbooks} workbooks in '{args.write_folder}'")
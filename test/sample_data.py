@@ -5,26 +5,49 @@ Simple script to sample 10 rows from a Delta table using polars.
 
 import polars as pl
 import random
+from deltalake import DeltaTable
 
 def sample_delta_data(delta_path: str, num_rows: int = 10) -> None:
     """
     Sample and print rows from a Delta table.
     
+    The row count is computed lazily and the sample is drawn from a few random
+    worksheet partitions, chosen from the Delta log's per-file row counts, so the
+    whole table is never loaded.
+    
     Args:
         delta_path: Path to the Delta table
         num_rows: Number of rows to sample (default: 10)
     """
     try:
-        # Read the Delta table
-        df = pl.scan_delta(delta_path).collect()
+        # Scan the Delta table lazily
+        lf = pl.scan_delta(delta_path)
         
         # Get total number of rows
-        total_rows = df.height
+        total_rows = lf.select(pl.len()).collect().item()
         print(f"Total rows in Delta table: {total_rows}")
         
         # Sample rows (use min in case there are fewer than num_rows)
         sample_size = min(num_rows, total_rows)
-        sampled_df = df.sample(sample_size, seed=42)
+        
+        # Shuffle the worksheet partitions and keep just enough of them to hold
+        # sample_size rows (files without row-count stats count as zero)
+        partitions = (
+            pl.DataFrame(DeltaTable(delta_path).get_add_actions(flatten=True))
+            .group_by("partition.worksheet")
+            .agg(pl.col("num_records").fill_null(0).sum())
+            .sort("partition.worksheet")
+            .sample(fraction=1.0, shuffle=True, seed=42)
+        )
+        worksheets = partitions.filter(
+            pl.col("num_records").cum_sum().shift(1, fill_value=0) < sample_size
+        ).get_column("partition.worksheet")
+        
+        sampled_df = (
+            lf.filter(pl.col("worksheet").is_in(worksheets.to_list()))
+            .collect()
+            .sample(sample_size, seed=42)
+        )
         
         # Print the sampled rows
         print(f"\n{sample_size} sample rows from Delta table at {delta_path}:")
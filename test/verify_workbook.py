@@ -8,88 +8,148 @@ by the excel_generator.py script.
 
 import argparse
 import os
+import sys
 from pathlib import Path
+from typing import List, Optional
 
 import openpyxl
-from openpyxl.cell.cell import Cell
 from openpyxl.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 
 
-def verify_workbook(workbook_path: str) -> None:
+def verify_workbook(workbook_path: str, sheets: Optional[List[str]] = None, full: bool = False) -> None:
     """
     Verify the structure and data of an Excel workbook.
     
+    By default, when a sheet has a dimension tag and its first 4 rows are
+    completely filled from A1, the sheet is assumed to be dense: only those
+    rows are read and the used range is reported as the non-empty count.
+    Every other sheet is scanned in full, including all workbooks from
+    excel_generator.py, whose write-only mode writes no dimension tag.
+    
     Args:
         workbook_path: Path to the Excel workbook to verify
+        sheets: Names of the worksheets to verify (default: all). Other
+            worksheets are never parsed.
+        full: Scan every row to count non-empty cells and measure the sheet
     """
-    print(f"\nVerifying workbook: {workbook_path}")
-    print("=" * 80)
+    # Collect the report and write it in one call at the end
+    out = []
+    out.append(f"\nVerifying workbook: {workbook_path}")
+    out.append("=" * 80)
     
     # Check if the file exists
     if not os.path.exists(workbook_path):
-        print(f"Error: File {workbook_path} does not exist.")
+        out.append(f"Error: File {workbook_path} does not exist.")
+        sys.stdout.write("\n".join(out) + "\n")
         return
     
     try:
-        # Load the workbook
-        wb = openpyxl.load_workbook(workbook_path)
-        
-        # Print workbook information
-        print(f"Workbook loaded successfully: {os.path.basename(workbook_path)}")
-        print(f"Number of worksheets: {len(wb.worksheets)}")
-        
-        # Print worksheet names
-        print("\nWorksheet names:")
-        for i, sheet_name in enumerate(wb.sheetnames, 1):
-            print(f"  {i}. {sheet_name}")
-        
-        # Verify each worksheet has data
-        print("\nWorksheet data verification:")
-        print("-" * 60)
+        # Load the workbook in read-only mode (streams each sheet's XML).
+        # data_only stays off so formula cells are reported as their formulas,
+        # even when the file holds no cached value for them.
+        wb = openpyxl.load_workbook(workbook_path, read_only=True, keep_links=False)
         
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
+        try:
+            # Build the sheet name list and worksheet lookup once. sheetnames
+            # also lists chartsheets, which wb.worksheets leaves out.
+            sheet_names = wb.sheetnames
+            worksheets = {ws.title: ws for ws in wb.worksheets}
             
-            # Get used range dimensions
-            min_row, min_col = 1, 1
-            max_row = ws.max_row
-            max_col = ws.max_column
+            # Print workbook information
+            out.append(f"Workbook loaded successfully: {os.path.basename(workbook_path)}")
+            out.append(f"Number of worksheets: {len(worksheets)}")
             
-            # Count non-empty cells
-            non_empty_count = 0
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None:
-                        non_empty_count += 1
+            # Print worksheet names
+            out.append("\nWorksheet names:")
+            for i, sheet_name in enumerate(sheet_names, 1):
+                out.append(f"  {i}. {sheet_name}")
             
-            print(f"\nSheet: {sheet_name}")
-            print(f"  Dimensions: {max_row} rows x {max_col} columns")
-            print(f"  Non-empty cells: {non_empty_count}")
+            # Verify each worksheet has data
+            out.append("\nWorksheet data verification:")
+            out.append("-" * 60)
             
-            # Sample data - print first row (headers)
-            if max_row > 0 and max_col > 0:
-                print("  Headers:")
-                for j in range(1, min(max_col + 1, 6)):  # First 5 columns or less
-                    cell_value = ws.cell(row=1, column=j).value
-                    print(f"    Column {j}: {cell_value}")
+            for sheet_name in sheets or sheet_names:
+                ws = worksheets.get(sheet_name)
+                if ws is None:
+                    out.append(f"\nSheet: {sheet_name}")
+                    if sheet_name in sheet_names:
+                        out.append("  Error: not a worksheet (e.g. a chartsheet), no cell data to verify.")
+                    else:
+                        out.append("  Error: worksheet does not exist.")
+                    continue
+                
+                # Without --full, trust the sheet's dimension tag only when the
+                # first rows are completely filled from A1: read just those
+                # and take the used range as the non-empty count. Read-only
+                # sheets saved without a dimension tag (max_row/max_column are
+                # None), or whose first rows have gaps, are scanned in full.
+                scan = full or ws.max_row is None or ws.max_column is None
+                if not scan:
+                    max_row, max_col = ws.max_row, ws.max_column
+                    rows = list(ws.iter_rows(max_row=min(max_row, 4), values_only=True))
+                    scan = not (
+                        ws.min_row == 1 and ws.min_column == 1
+                        and len(rows) == min(max_row, 4)
+                        and all(len(row) == max_col and None not in row for row in rows)
+                    )
+                    non_empty_count = max_row * max_col
+                if scan:
+                    non_empty_count = 0
+                    max_row, max_col = 0, 0
+                    rows = ws.iter_rows(values_only=True)
+                
+                # Single pass over the rows (values only, no Cell objects):
+                # keep the header row and sample rows and, when scanning, count
+                # non-empty cells and get the used range dimensions
+                headers = ()
+                samples = []
+                for i, row in enumerate(rows, 1):
+                    if scan:
+                        non_empty_count += len(row) - row.count(None)
+                        max_row = i
+                        max_col = max(max_col, len(row))
+                    if i == 1:
+                        headers = row[:5]
+                    elif i <= 4:
+                        samples.append(row[:3])
+                
+                out.append(f"\nSheet: {sheet_name}")
+                out.append(f"  Dimensions: {max_row} rows x {max_col} columns")
+                if scan:
+                    out.append(f"  Non-empty cells: {non_empty_count}")
+                else:
+                    out.append(f"  Non-empty cells: {non_empty_count} (from dimensions, use --full to count)")
                 
-                # Print first few data rows
-                if max_row > 1:
-                    print("  Data samples (first 3 rows):")
-                    for i in range(2, min(max_row + 1, 5)):  # Rows 2-4 (or less)
-                        row_values = []
-                        for j in range(1, min(max_col + 1, 4)):  # First 3 columns or less
-                            cell_value = ws.cell(row=i, column=j).value
-                            row_values.append(f"{cell_value}")
-                        print(f"    Row {i}: {' | '.join(row_values)}")
+                # Sample data - print first row (headers)
+                if max_row > 0 and max_col > 0:
+                    out.append("  Headers:")
+                    # First 5 columns or less, padding rows shorter than max_col
+                    num_cols = min(max_col, 5)
+                    headers += (None,) * (num_cols - len(headers))
+                    for j, cell_value in enumerate(headers, 1):
+                        out.append(f"    Column {j}: {cell_value}")
+                    
+                    # Print first few data rows
+                    if max_row > 1:
+                        out.append("  Data samples (first 3 rows):")
+                        # Rows 2-4 (or less), first 3 columns or less
+                        num_cols = min(max_col, 3)
+                        for i, row in enumerate(samples, 2):
+                            row += (None,) * (num_cols - len(row))
+                            row_values = [str(cell_value) for cell_value in row]
+                            out.append(f"    Row {i}: {' | '.join(row_values)}")
         
-        # Close the workbook
-        wb.close()
-        print("\nVerification complete.")
+        finally:
+            # Close the workbook (releases the read-only file handle)
+            wb.close()
+        
+        out.append("\nVerification complete.")
         
     except Exception as e:
-        print(f"Error verifying workbook: {str(e)}")
+        out.append(f"Error verifying workbook: {str(e)}")
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def main():
@@ -102,9 +162,21 @@ def main():
         type=str,
         help="Path to the Excel workbook to verify"
     )
+    parser.add_argument(
+        "--sheets",
+        type=str,
+        default=None,
+        help="Comma-separated names of the worksheets to verify (default: all)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Scan every row to count non-empty cells instead of trusting the sheet dimensions"
+    )
     
     args = parser.parse_args()
-    verify_workbook(args.workbook_path)
+    sheets = args.sheets.split(",") if args.sheets else None
+    verify_workbook(args.workbook_path, sheets, args.full)
 
 
 if __name__ == "__main__":